@@ -0,0 +1,58 @@
+#zone_intrusion_detector\benchmarks\bench_zones.py
+"""Time ZoneManager.point_in_zones against a linear scan.
+
+With disjoint zones the indexed lookup should stay roughly flat as the
+zone count grows (one candidate per point); with overlapping zones its
+cost follows the number of candidates, not the total.
+
+    python -m benchmarks.bench_zones
+"""
+import random
+import timeit
+from shapely.geometry import Point
+from src.zone_manager import ZoneManager
+
+def linear_point_in_zones(zone_manager, point):
+    p = Point(point)
+    return {zone["label"] for zone in zone_manager.zones if zone["polygon"].contains(p)}
+
+def disjoint_zones(count, size=10, gap=5):
+    """Grid of non-overlapping squares (e.g. parking bays)"""
+    zm = ZoneManager()
+    per_row = int(count ** 0.5) + 1
+    for i in range(count):
+        x = (i % per_row) * (size + gap)
+        y = (i // per_row) * (size + gap)
+        zm.add_zone(f"bay{i}", [(x, y), (x + size, y), (x + size, y + size), (x, y + size)], "#3498db")
+    extent = per_row * (size + gap)
+    return zm, extent
+
+def overlapping_zones(count, overlap, extent=1000):
+    """Zones stacked so every point falls inside about `overlap` of them"""
+    zm = ZoneManager()
+    stripe = extent / max(1, count // overlap)
+    for i in range(count):
+        x = (i // overlap) * stripe
+        zm.add_zone(f"lane{i}", [(x, 0), (x + stripe, 0), (x + stripe, extent), (x, extent)], "#3498db")
+    return zm, extent
+
+def bench(zm, extent, points=2000, repeat=3):
+    rng = random.Random(0)
+    samples = [(rng.uniform(0, extent), rng.uniform(0, extent)) for _ in range(points)]
+    indexed = min(timeit.repeat(lambda: [zm.point_in_zones(p) for p in samples], number=1, repeat=repeat))
+    linear = min(timeit.repeat(lambda: [linear_point_in_zones(zm, p) for p in samples], number=1, repeat=repeat))
+    return indexed / points * 1e6, linear / points * 1e6
+
+def main():
+    print(f"{'layout':<24}{'zones':>7}{'indexed us/pt':>16}{'linear us/pt':>15}")
+    for count in (10, 100, 1000):
+        zm, extent = disjoint_zones(count)
+        indexed, linear = bench(zm, extent)
+        print(f"{'disjoint':<24}{count:>7}{indexed:>16.2f}{linear:>15.2f}")
+    for count, overlap in ((100, 1), (100, 10), (1000, 10), (1000, 100)):
+        zm, extent = overlapping_zones(count, overlap)
+        indexed, linear = bench(zm, extent)
+        print(f"{f'overlap ~{overlap} candidates':<24}{count:>7}{indexed:>16.2f}{linear:>15.2f}")
+
+if __name__ == "__main__":
+    main()
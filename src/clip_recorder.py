@@ -0,0 +1,193 @@
+#zone_intrusion_detector\src\clip_recorder.py
+import os
+import time
+import queue
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+import cv2
+
+class ClipRecorder:
+    """Pre/post-event clip recorder for one video stream.
+
+    Recent frames are kept in a ring buffer capped by both frame count and
+    bytes (optionally JPEG-compressed). trigger() starts a clip from the
+    buffered pre-event frames and streams them, followed by live frames
+    until post_seconds after the last trigger, to a background encoder,
+    so writing video never blocks the inference loop.
+
+    Memory per stream is capped at max_buffer_mb (ring buffer) plus
+    max_pending_mb (frames handed to the encoder but not yet written).
+    A clip that would exceed the pending budget is truncated; one whose
+    pre-event frames cannot be queued at all is dropped.
+    """
+    def __init__(self, output_dir="clips", pre_seconds=5.0, post_seconds=5.0, max_clip_seconds=60.0,
+                 max_buffer_frames=150, max_buffer_mb=64, max_pending_mb=64, jpeg_quality=None,
+                 fallback_fps=15.0):
+        self.output_dir = output_dir
+        self.pre_seconds = pre_seconds
+        self.post_seconds = post_seconds
+        self.max_clip_seconds = max_clip_seconds
+        self.max_buffer_bytes = int(max_buffer_mb * 1024 * 1024)
+        self.max_pending_bytes = int(max_pending_mb * 1024 * 1024)
+        self.jpeg_quality = jpeg_quality  # None keeps raw frames
+        self.fallback_fps = fallback_fps
+        self.app_logger = logging.getLogger(__name__)
+
+        self.buffer = deque(maxlen=max_buffer_frames)  # (timestamp, data, nbytes)
+        self.buffer_bytes = 0
+        self.active_clip = None
+
+        # Encoder messages: ("start", clip), ("frame", data, nbytes), ("end", clip), None to exit
+        self.pending = queue.Queue()
+        self.pending_bytes = 0
+        self._pending_lock = threading.Lock()
+
+        self.clips_written = 0
+        self.dropped_clips = 0
+        self.truncated_clips = 0
+        self._worker = threading.Thread(target=self._encode_loop, name="clip-encoder", daemon=True)
+        self._worker.start()
+
+    def add_frame(self, frame, timestamp=None):
+        timestamp = time.time() if timestamp is None else timestamp
+        data = self._pack(frame)
+        nbytes = data.nbytes
+
+        if len(self.buffer) == self.buffer.maxlen:
+            self.buffer_bytes -= self.buffer[0][2]
+        self.buffer.append((timestamp, data, nbytes))
+        self.buffer_bytes += nbytes
+        while self.buffer_bytes > self.max_buffer_bytes and len(self.buffer) > 1:
+            self.buffer_bytes -= self.buffer.popleft()[2]
+
+        clip = self.active_clip
+        if clip is None:
+            return
+        if not self._queue_frame(data, nbytes):
+            self.truncated_clips += 1
+            self.app_logger.warning("Clip encoder backlog over budget, truncating clip")
+            self._finish_clip()
+            return
+        if timestamp >= clip["end_time"] or timestamp - clip["start_time"] >= self.max_clip_seconds:
+            self._finish_clip()
+
+    def trigger(self, event):
+        """Start a clip for the event, or extend the clip already recording"""
+        if self.active_clip is not None:
+            self.active_clip["end_time"] = event.timestamp + self.post_seconds
+            self.active_clip["events"].append(event)
+            return
+
+        pre_frames = [entry for entry in self.buffer if entry[0] >= event.timestamp - self.pre_seconds]
+        # Keep the most recent pre-event frames that fit in the encoder budget
+        with self._pending_lock:
+            available = self.max_pending_bytes - self.pending_bytes
+        trimmed = False
+        while pre_frames and sum(entry[2] for entry in pre_frames) > available:
+            pre_frames.pop(0)
+            trimmed = True
+        if trimmed and not pre_frames:
+            self.dropped_clips += 1
+            self.app_logger.warning("Clip encoder backlog over budget, dropping clip")
+            return
+
+        duration = pre_frames[-1][0] - pre_frames[0][0] if pre_frames else 0
+        self.active_clip = {
+            "start_time": pre_frames[0][0] if pre_frames else event.timestamp,
+            "end_time": event.timestamp + self.post_seconds,
+            "events": [event],
+            "fps": (len(pre_frames) - 1) / duration if duration > 0 else self.fallback_fps
+        }
+        if trimmed:
+            self.truncated_clips += 1
+        self.pending.put(("start", self.active_clip))
+        for _, data, nbytes in pre_frames:
+            self._queue_frame(data, nbytes)
+
+    def metrics(self):
+        return {
+            "buffer_frames": len(self.buffer),
+            "buffer_bytes": self.buffer_bytes,
+            "pending_bytes": self.pending_bytes,
+            "clips_written": self.clips_written,
+            "dropped_clips": self.dropped_clips,
+            "truncated_clips": self.truncated_clips
+        }
+
+    def close(self, timeout=10.0):
+        """Flush any clip in progress and wait for pending encodes"""
+        if self.active_clip is not None:
+            self._finish_clip()
+        self.pending.put(None)
+        self._worker.join(timeout)
+
+    def _queue_frame(self, data, nbytes):
+        with self._pending_lock:
+            if self.pending_bytes + nbytes > self.max_pending_bytes:
+                return False
+            self.pending_bytes += nbytes
+        self.pending.put(("frame", data, nbytes))
+        return True
+
+    def _pack(self, frame):
+        if self.jpeg_quality is None:
+            return frame
+        ok, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if not ok:
+            return frame.copy()
+        return encoded
+
+    def _unpack(self, data):
+        if data.ndim == 3:
+            return data
+        return cv2.imdecode(data, cv2.IMREAD_COLOR)
+
+    def _finish_clip(self):
+        self.pending.put(("end", self.active_clip))
+        self.active_clip = None
+
+    def _encode_loop(self):
+        clip = None
+        writer = None
+        path = None
+        frames = 0
+        while True:
+            message = self.pending.get()
+            if message is None:
+                break
+            kind = message[0]
+            try:
+                if kind == "start":
+                    clip, writer, path, frames = message[1], None, self._clip_path(message[1]), 0
+                elif kind == "frame":
+                    frame = self._unpack(message[1])
+                    if writer is None:
+                        h, w = frame.shape[:2]
+                        os.makedirs(self.output_dir, exist_ok=True)
+                        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), clip["fps"], (w, h))
+                    writer.write(frame)
+                    frames += 1
+                elif kind == "end" and writer is not None:
+                    writer.release()
+                    writer = None
+                    self.clips_written += 1
+                    self.app_logger.info(f"Saved clip {path} ({frames} frames, {len(clip['events'])} event(s))")
+            except Exception as e:
+                self.app_logger.error(f"Failed to write clip: {str(e)}")
+            finally:
+                if kind == "frame":
+                    with self._pending_lock:
+                        self.pending_bytes -= message[2]
+        if writer is not None:
+            writer.release()
+
+    def _clip_path(self, clip):
+        first_event = clip["events"][0]
+        # Wall-clock name even when event timestamps are video positions
+        stamp = datetime.fromtimestamp(first_event.published_at).strftime("%Y%m%d_%H%M%S")
+        return os.path.join(
+            self.output_dir,
+            f"{stamp}_{first_event.event_type}_{first_event.zone}_obj{first_event.obj_id}.mp4"
+        )
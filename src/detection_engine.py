@@ -1,31 +1,41 @@
 #zone_intrusion_detector\src\detection_engine.py
-import os
 import cv2
 import time
 import logging
-import torch
 import numpy as np
-from ultralytics import YOLO
+from src import model_registry
+from src.event_bus import ZoneEvent, build_event_bus
+from src.zone_analytics import ZoneAnalytics
+from src.clip_recorder import ClipRecorder
 from src.tracker import CentroidTracker
 from src.zone_manager import ZoneManager
 from src.logger import EventLogger
 
-torch.set_float32_matmul_precision('high')
-
 class DetectionEngine:
-    def __init__(self, video_path, zone_manager, event_logger, config):
+    def __init__(self, zone_manager, event_logger, config, frame_shape=None):
         self.zone_manager = zone_manager
         self.event_logger = event_logger
         self.config = config
         self.app_logger = logging.getLogger(__name__)
         self.gui_callback = lambda text: None
         self.object_zone_states = {}
+        self.last_locations = {}  # obj_id -> last centroid, for exits of dropped tracks
+        self.last_seen = {}       # obj_id -> timestamp of last detection, for exits of dropped tracks
+        
+        self.device = config.get("device")
         
         try:
             model_path = config["model"]
-            os.makedirs(os.path.dirname(model_path), exist_ok=True)
-            self.model = YOLO(model_path, task='detect')
-            self.app_logger.info(f"Loaded YOLO model: {model_path}")
+            self.model = model_registry.get_model(
+                model_path,
+                backend=config.get("backend", "ultralytics"),
+                device=self.device,
+                warmup_runs=config.get("warmup_runs", 1),
+                frame_shape=frame_shape,
+                imgsz=config.get("imgsz", 640),
+                classes=config["classes"]
+            )
+            self.app_logger.info(f"Using YOLO model: {model_path}")
         except Exception as e:
             self.app_logger.error(f"Error loading model: {str(e)}")
             raise RuntimeError(f"Model initialization failed: {str(e)}")
@@ -35,37 +45,85 @@ class DetectionEngine:
             max_distance=config["max_distance"]
         )
         
-        self.cap = cv2.VideoCapture(video_path)
-        if not self.cap.isOpened():
-            raise IOError(f"Cannot open video: {video_path}")
+        analytics_config = config.get("analytics", {})
+        self.analytics = ZoneAnalytics(
+            dwell_bins=analytics_config.get("dwell_bins", (1, 5, 10, 30, 60, 300, 600)),
+            bucket_seconds=analytics_config.get("bucket_seconds", 60),
+            persist_path=analytics_config.get("file"),
+            persist_interval=analytics_config.get("persist_interval", 30)
+        )
+        
+        clip_config = config.get("clips", {})
+        self.clip_recorder = None
+        self.clip_trigger_events = set(clip_config.get("trigger_events", ["ENTRY"]))
+        if clip_config.get("enabled", False):
+            self.clip_recorder = ClipRecorder(
+                output_dir=clip_config.get("output_dir", "clips"),
+                pre_seconds=clip_config.get("pre_seconds", 5.0),
+                post_seconds=clip_config.get("post_seconds", 5.0),
+                max_clip_seconds=clip_config.get("max_clip_seconds", 60.0),
+                max_buffer_frames=clip_config.get("max_buffer_frames", 150),
+                max_buffer_mb=clip_config.get("max_buffer_mb", 64),
+                max_pending_mb=clip_config.get("max_pending_mb", 64),
+                jpeg_quality=clip_config.get("jpeg_quality")
+            )
         
         self.frame_count = 0
         self.prev_objects = {}
         self.start_time = time.time()
         
-    def process_frame(self, frame):
+        # Events are consumed by sinks on their own threads, off the detection loop
+        self.event_bus = build_event_bus(
+            config,
+            event_logger,
+            lambda event: self.gui_callback(event.describe())
+        )
+        self.event_bus.start()
+        
+    def process_frame(self, frame, timestamp=None):
+        """Detect, track and check zones for one frame.
+
+        timestamp is the frame time in seconds (e.g. video position); it
+        defaults to wall-clock time. Passing it makes offline runs
+        deterministic. Events carry it as timestamp, with the wall-clock
+        time in published_at.
+        """
+        now = time.time() if timestamp is None else timestamp
         results = self.model(frame, 
                              classes=self.config["classes"], 
                              conf=self.config["confidence"],
+                             imgsz=self.config.get("imgsz", 640),
+                             device=self.device,
                              verbose=False)
         
-        detections = []
-        for result in results:
-            for box in result.boxes:
-                x1, y1, x2, y2 = map(int, box.xyxy[0])
-                conf = float(box.conf[0])
-                cls_id = int(box.cls[0])
-                detections.append((x1, y1, x2, y2, cls_id, conf))
-        
+        detections = self.extract_detections(results)
         objects = self.tracker.update(detections)
-        self.process_intrusions(objects)
+        self.process_intrusions(objects, now)
         frame = self.visualize(frame, objects)
+        if self.clip_recorder:
+            self.clip_recorder.add_frame(frame, now)
         
         self.frame_count += 1
         self.prev_objects = objects
         return frame
     
-    def process_intrusions(self, current_objects):
+    @staticmethod
+    def extract_detections(results):
+        """Return an (N, 6) float32 array of [x1, y1, x2, y2, cls_id, conf]"""
+        arrays = []
+        for result in results:
+            if len(result.boxes) == 0:
+                continue
+            # boxes.data is [x1, y1, x2, y2, (track_id), conf, cls]; one device transfer per result
+            data = result.boxes.data.cpu().numpy()
+            arrays.append(data[:, [0, 1, 2, 3, -1, -2]])
+        
+        if not arrays:
+            return np.empty((0, 6), dtype=np.float32)
+        return np.concatenate(arrays).astype(np.float32, copy=False)
+    
+    def process_intrusions(self, current_objects, now=None):
+        now = time.time() if now is None else now
         # Initialize new objects
         for obj_id in current_objects:
             if obj_id not in self.object_zone_states:
@@ -75,6 +133,10 @@ class DetectionEngine:
         for obj_id, obj in current_objects.items():
             centroid = (obj["centroid_x"], obj["centroid_y"])
             current_zones = self.zone_manager.point_in_zones(centroid)
+            location = (int(centroid[0]), int(centroid[1]))
+            self.last_locations[obj_id] = location
+            if self.tracker.disappeared.get(obj_id) == 0:
+                self.last_seen[obj_id] = now
             
             # Get previous zones
             prev_zones = set()
@@ -86,31 +148,59 @@ class DetectionEngine:
                 if zone not in self.object_zone_states[obj_id]:
                     self.object_zone_states[obj_id][zone] = {
                         "in_zone": False,
-                        "entry_time": time.time()
+                        "entry_time": now
                     }
                 
                 # Only trigger entry if not already in zone
                 if not self.object_zone_states[obj_id][zone]["in_zone"]:
                     # Require 100ms in zone to confirm entry
-                    if time.time() - self.object_zone_states[obj_id][zone]["entry_time"] > 0.1:
-                        self.event_logger.log_event("ENTRY", obj_id, zone, centroid)
-                        self.gui_callback(f"ENTRY - Object {obj_id} entered {zone}")
+                    if now - self.object_zone_states[obj_id][zone]["entry_time"] > 0.1:
+                        self.emit_event(ZoneEvent("ENTRY", obj_id, zone, location, now))
                         self.object_zone_states[obj_id][zone]["in_zone"] = True
             
             # Check for exits
             for zone in prev_zones - current_zones:
                 if zone in self.object_zone_states[obj_id]:
                     if self.object_zone_states[obj_id][zone]["in_zone"]:
-                        self.event_logger.log_event("EXIT", obj_id, zone, centroid)
-                        self.gui_callback(f"EXIT - Object {obj_id} exited {zone}")
+                        self.emit_event(ZoneEvent("EXIT", obj_id, zone, location, now))
                         self.object_zone_states[obj_id][zone]["in_zone"] = False
                         # Reset entry time for potential re-entry
-                        self.object_zone_states[obj_id][zone]["entry_time"] = time.time()
+                        self.object_zone_states[obj_id][zone]["entry_time"] = now
             
             # Update object state
             obj["zones"] = current_zones
+        
+        # Tracks the tracker has dropped exit every zone they were in, so all consumers see the EXIT.
+        # The exit is stamped when the object was last seen, not max_disappeared frames later.
+        for obj_id in list(self.object_zone_states):
+            if obj_id not in self.tracker.objects:
+                location = self.last_locations.pop(obj_id, None)
+                last_seen = self.last_seen.pop(obj_id, now)
+                for zone, state in self.object_zone_states.pop(obj_id).items():
+                    if state["in_zone"]:
+                        self.emit_event(ZoneEvent("EXIT", obj_id, zone, location, last_seen))
+        
+        self.analytics.maybe_persist()
+
+    def emit_event(self, event):
+        if event.event_type == "ENTRY":
+            self.analytics.on_entry(event.obj_id, event.zone, event.timestamp)
+        else:
+            self.analytics.on_exit(event.obj_id, event.zone, event.timestamp)
+        if self.clip_recorder and event.event_type in self.clip_trigger_events:
+            self.clip_recorder.trigger(event)
+        self.event_bus.publish(event)
+
+    def get_analytics(self):
+        """Cheap snapshot of occupancy, dwell histograms and peak counts"""
+        return self.analytics.snapshot()
+
+    def get_event_metrics(self):
+        """Per-sink queue depth, delivery/drop counts and lag"""
+        return self.event_bus.metrics()
 
     def set_gui_callback(self, callback):
+        """Set a text callback; it runs on the GUI sink thread, not the caller's"""
         self.gui_callback = callback
  
     def visualize(self, frame, objects):
@@ -146,5 +236,12 @@ class DetectionEngine:
         return frame
     
     def cleanup(self):
-        if self.cap:
-            self.cap.release()
\ No newline at end of file
+        # The model stays cached in model_registry for the next session
+        self.event_bus.stop()
+        if self.clip_recorder:
+            self.clip_recorder.close()
+        self.analytics.persist()
+        self.object_zone_states.clear()
+        self.last_locations.clear()
+        self.last_seen.clear()
+        self.prev_objects = {}
\ No newline at end of file
@@ -0,0 +1,266 @@
+#zone_intrusion_detector\src\evaluation.py
+"""Offline evaluation of DetectionEngine: event accuracy vs. speed.
+
+Runs the engine over a video and a zones file, matches its ENTRY/EXIT
+events against a ground-truth file, and sweeps a parameter grid in
+worker processes. Frames are timestamped by video position, so results
+do not depend on wall-clock speed.
+
+FPS is timed end to end, including decode (strided-out frames are only
+grabbed), with torch pinned to --torch-threads per worker so figures do
+not depend on how many trials run at once. Trials run one at a time by
+default; --workers N runs them in parallel, which is only meaningful for
+timing on CPU.
+
+Ground truth is a JSON list of events:
+    [{"event_type": "ENTRY", "zone": "zone1", "time": 3.2}, ...]
+where "time" is seconds from the start of the video.
+
+Example:
+    python -m src.evaluation --video data/test_video.mp4 --zones data/2zonesys.json \\
+        --ground-truth data/gt.json --grid grid.yaml --output sweep.csv
+
+grid.yaml maps parameter names to value lists, e.g.:
+    confidence: [0.3, 0.5]
+    max_distance: [50, 70]
+    stride: [1, 2]
+"""
+import csv
+import json
+import time
+import copy
+import argparse
+import itertools
+import logging
+from concurrent.futures import ProcessPoolExecutor
+import yaml
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GRID = {
+    "confidence": [0.3, 0.5],
+    "max_distance": [50, 70],
+    "max_disappeared": [30],
+    "stride": [1, 2],
+    "imgsz": [640],
+}
+
+# Parameters consumed by the harness itself rather than DetectionEngine
+HARNESS_PARAMS = ("stride",)
+
+def load_ground_truth(file_path):
+    with open(file_path, "r") as f:
+        events = json.load(f)
+    return [(e["event_type"], e["zone"], float(e["time"])) for e in events]
+
+def match_events(predicted, ground_truth, tolerance=1.0):
+    """Greedily match (event_type, zone, time) tuples within tolerance seconds, closest first"""
+    candidates = []
+    for i, (p_type, p_zone, p_time) in enumerate(predicted):
+        for j, (g_type, g_zone, g_time) in enumerate(ground_truth):
+            if p_type == g_type and p_zone == g_zone and abs(p_time - g_time) <= tolerance:
+                candidates.append((abs(p_time - g_time), i, j))
+    candidates.sort()
+
+    used_pred = set()
+    used_gt = set()
+    errors = []
+    for error, i, j in candidates:
+        if i in used_pred or j in used_gt:
+            continue
+        used_pred.add(i)
+        used_gt.add(j)
+        errors.append(error)
+
+    matched = len(errors)
+    precision = matched / len(predicted) if predicted else (1.0 if not ground_truth else 0.0)
+    recall = matched / len(ground_truth) if ground_truth else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {
+        "matched": matched,
+        "predicted": len(predicted),
+        "ground_truth": len(ground_truth),
+        "precision": precision,
+        "recall": recall,
+        "f1": f1,
+        "mean_timing_error": sum(errors) / matched if matched else None
+    }
+
+def offline_config(base_config, params):
+    """Detection config for a trial: base settings plus params, with side outputs disabled"""
+    config = copy.deepcopy(base_config)
+    for key, value in params.items():
+        if key not in HARNESS_PARAMS:
+            config[key] = value
+    config["events"] = {"file": {"enabled": False}, "gui": {"enabled": False}}
+    config["analytics"] = {}
+    config["clips"] = {"enabled": False}
+    return config
+
+def run_trial(video_path, zones_path, ground_truth, base_config, params, tolerance=1.0):
+    """Run one parameter combination; returns params merged with accuracy and speed metrics"""
+    import cv2
+    from src.detection_engine import DetectionEngine
+    from src.zone_manager import ZoneManager
+
+    class RecordingEngine(DetectionEngine):
+        def __init__(self, *args, **kwargs):
+            self.recorded_events = []
+            super().__init__(*args, **kwargs)
+
+        def emit_event(self, event):
+            self.recorded_events.append(event)
+            super().emit_event(event)
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError(f"Cannot open video: {video_path}")
+    video_fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    frame_shape = (int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)), int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)))
+
+    zone_manager = ZoneManager()
+    zone_manager.load_zones(zones_path)
+    # The model is loaded and warmed up at the video's frame shape here, outside the timed loop
+    engine = RecordingEngine(
+        zone_manager, None, offline_config(base_config, params),
+        frame_shape=frame_shape if all(frame_shape) else None
+    )
+    stride = max(1, int(params.get("stride", 1)))
+
+    frame_index = 0
+    processed = 0
+    # Timed end to end, including decode: skipped frames are grabbed without decoding
+    started = time.perf_counter()
+    try:
+        while True:
+            if frame_index % stride == 0:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                engine.process_frame(frame, timestamp=frame_index / video_fps)
+                processed += 1
+            elif not cap.grab():
+                break
+            frame_index += 1
+        elapsed = time.perf_counter() - started
+    finally:
+        cap.release()
+        engine.cleanup()
+
+    predicted = [(e.event_type, e.zone, e.timestamp) for e in engine.recorded_events]
+    result = dict(params)
+    result.update(match_events(predicted, ground_truth, tolerance))
+    result["frames"] = frame_index
+    result["processed_frames"] = processed
+    result["processing_fps"] = processed / elapsed if elapsed > 0 else 0.0
+    # Source frames covered per second of processing, i.e. real-time capacity including stride
+    result["effective_fps"] = frame_index / elapsed if elapsed > 0 else 0.0
+    return result
+
+def resolve_device(device):
+    """The device a trial will actually run on; None means CUDA when available, as in ultralytics"""
+    if device is not None:
+        device = str(device)
+        # Bare GPU indices ("0", "0,1") select CUDA in ultralytics
+        return f"cuda:{device}" if device.replace(",", "").isdigit() else device
+    try:
+        import torch
+    except ImportError:
+        return "cpu"
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+def init_worker(torch_threads=1):
+    """Pin torch to a fixed thread count so trial speed does not depend on how many run in parallel"""
+    import torch
+    torch.set_num_threads(torch_threads)
+
+def expand_grid(grid):
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+def pareto_front(results, accuracy_key="f1", speed_key="effective_fps"):
+    """Results not dominated on (accuracy, speed), sorted by speed"""
+    front = []
+    for r in results:
+        dominated = any(
+            o[accuracy_key] >= r[accuracy_key] and o[speed_key] >= r[speed_key]
+            and (o[accuracy_key] > r[accuracy_key] or o[speed_key] > r[speed_key])
+            for o in results
+        )
+        if not dominated:
+            front.append(r)
+    return sorted(front, key=lambda r: r[speed_key])
+
+def sweep(video_path, zones_path, ground_truth_path, base_config, grid, workers=1, tolerance=1.0, torch_threads=1):
+    ground_truth = load_ground_truth(ground_truth_path)
+    trials = expand_grid(grid)
+    logger.info(f"Running {len(trials)} trial(s) on {workers} worker(s), {torch_threads} torch thread(s) each")
+    if workers > 1 and resolve_device(base_config.get("device")).startswith("cuda"):
+        logger.warning("Parallel workers share the GPU; FPS figures include contention. Use --workers 1 for timing.")
+
+    if workers <= 1:
+        init_worker(torch_threads)
+        return [run_trial(video_path, zones_path, ground_truth, base_config, p, tolerance) for p in trials]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(torch_threads,)) as executor:
+        futures = [
+            executor.submit(run_trial, video_path, zones_path, ground_truth, base_config, p, tolerance)
+            for p in trials
+        ]
+        return [future.result() for future in futures]
+
+def format_table(results, columns):
+    def fmt(value):
+        if isinstance(value, float):
+            return f"{value:.3f}"
+        return "-" if value is None else str(value)
+
+    rows = [[fmt(r.get(c)) for c in columns] for r in results]
+    widths = [max(len(c), *(len(row[i]) for row in rows)) if rows else len(c) for i, c in enumerate(columns)]
+    lines = ["  ".join(c.ljust(w) for c, w in zip(columns, widths))]
+    lines.append("  ".join("-" * w for w in widths))
+    for row in rows:
+        lines.append("  ".join(v.ljust(w) for v, w in zip(row, widths)))
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep detection parameters: event accuracy vs. speed")
+    parser.add_argument("--video", required=True)
+    parser.add_argument("--zones", required=True, help="Zones JSON, e.g. data/2zonesys.json")
+    parser.add_argument("--ground-truth", required=True, help="Ground-truth events JSON")
+    parser.add_argument("--settings", default="config/settings.yaml")
+    parser.add_argument("--grid", help="YAML mapping of parameter -> list of values")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Parallel trials; keep at 1 on a GPU, where workers contend for the device")
+    parser.add_argument("--torch-threads", type=int, default=1,
+                        help="Torch threads per worker; fixed so FPS is comparable across worker counts")
+    parser.add_argument("--tolerance", type=float, default=1.0, help="Max event timing error in seconds")
+    parser.add_argument("--output", help="Write all trial results to this CSV file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    with open(args.settings, "r") as f:
+        base_config = yaml.safe_load(f)["detection"]
+    grid = DEFAULT_GRID
+    if args.grid:
+        with open(args.grid, "r") as f:
+            grid = yaml.safe_load(f)
+
+    results = sweep(args.video, args.zones, args.ground_truth, base_config, grid, args.workers, args.tolerance,
+                    args.torch_threads)
+
+    columns = list(grid) + ["precision", "recall", "f1", "mean_timing_error", "processing_fps", "effective_fps"]
+    print("All trials:")
+    print(format_table(sorted(results, key=lambda r: -r["f1"]), columns))
+    print("\nPareto front (F1 vs. effective FPS):")
+    print(format_table(pareto_front(results), columns))
+
+    if args.output:
+        with open(args.output, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(results[0].keys()) if results else columns)
+            writer.writeheader()
+            writer.writerows(results)
+
+if __name__ == "__main__":
+    main()
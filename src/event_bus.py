@@ -0,0 +1,293 @@
+#zone_intrusion_detector\src\event_bus.py
+import os
+import time
+import sqlite3
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass, field, asdict
+import requests
+
+logger = logging.getLogger(__name__)
+
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+
+@dataclass(frozen=True)
+class ZoneEvent:
+    event_type: str  # "ENTRY" or "EXIT"
+    obj_id: int
+    zone: str
+    location: tuple = None
+    timestamp: float = field(default_factory=time.time)  # Frame time; a video position in offline runs
+    published_at: float = field(default_factory=time.time)  # Wall-clock time the event was created
+
+    def describe(self):
+        verb = "entered" if self.event_type == "ENTRY" else "exited"
+        return f"{self.event_type} - Object {self.obj_id} {verb} {self.zone}"
+
+    def to_dict(self):
+        return asdict(self)
+
+class EventSink:
+    """Consumes events on its own thread, in batches, from a bounded queue.
+
+    publish() only appends to a deque, so a slow sink never blocks the
+    detection loop; when the queue is full the drop policy decides which
+    event is lost. Subclasses implement handle_batch() and optionally
+    open()/close(), which run on the sink thread.
+    """
+    def __init__(self, name, batch_size=1, flush_interval=0.5, max_queue=1000, drop_policy=DROP_OLDEST):
+        if drop_policy not in (DROP_OLDEST, DROP_NEWEST):
+            raise ValueError(f"Unknown drop policy: {drop_policy}")
+        self.name = name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.drop_policy = drop_policy
+        # With maxlen, append() discards the oldest event on overflow
+        self.queue = deque(maxlen=max_queue if drop_policy == DROP_OLDEST else None)
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        
+        self.published = 0
+        self.dropped = 0
+        self.delivered = 0
+        self.failed = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+
+    def offer(self, event):
+        self.published += 1
+        if len(self.queue) >= self.max_queue:
+            self.dropped += 1
+            if self.drop_policy == DROP_NEWEST:
+                return
+        self.queue.append(event)
+        if len(self.queue) >= self.batch_size:
+            self._wakeup.set()
+
+    def start(self):
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name=f"event-sink-{self.name}", daemon=True)
+        self._thread.start()
+
+    def request_stop(self):
+        """Ask the sink thread to flush and exit, without waiting"""
+        self._stopping.set()
+        self._wakeup.set()
+
+    def join(self, timeout=None):
+        if self._thread is None:
+            return
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning(f"Event sink '{self.name}' did not stop in time; {len(self.queue)} event(s) left")
+        self._thread = None
+
+    def stop(self, timeout=5.0):
+        self.request_stop()
+        self.join(timeout)
+
+    def metrics(self):
+        return {
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "queued": len(self.queue),
+            "last_lag": self.last_lag,
+            "max_lag": self.max_lag
+        }
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def handle_batch(self, events):
+        raise NotImplementedError
+
+    def _run(self):
+        try:
+            self.open()
+        except Exception as e:
+            logger.error(f"Event sink '{self.name}' failed to open: {str(e)}")
+            return
+        try:
+            while not self._stopping.is_set():
+                self._wakeup.wait(self.flush_interval)
+                self._wakeup.clear()
+                self._drain()
+            self._drain()
+        finally:
+            self.close()
+
+    def _drain(self):
+        while self.queue:
+            batch = []
+            while self.queue and len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.popleft())
+                except IndexError:
+                    break
+            if not batch:
+                break
+            
+            try:
+                self.handle_batch(batch)
+            except Exception as e:
+                self.failed += len(batch)
+                logger.error(f"Event sink '{self.name}' failed: {str(e)}")
+                continue
+            
+            self.delivered += len(batch)
+            self.last_lag = time.time() - batch[0].published_at
+            self.max_lag = max(self.max_lag, self.last_lag)
+
+class LoggerSink(EventSink):
+    """Writes events through EventLogger (the intrusion events log file)"""
+    def __init__(self, event_logger, **kwargs):
+        super().__init__("file", **kwargs)
+        self.event_logger = event_logger
+
+    def handle_batch(self, events):
+        for event in events:
+            self.event_logger.log_event(event.event_type, event.obj_id, event.zone, event.location)
+
+class CallbackSink(EventSink):
+    """Calls a function per event on the sink thread (GUI callers must marshal to their own thread)"""
+    def __init__(self, callback, name="callback", **kwargs):
+        super().__init__(name, **kwargs)
+        self.callback = callback
+
+    def handle_batch(self, events):
+        for event in events:
+            self.callback(event)
+
+class SQLiteSink(EventSink):
+    """Appends events to an SQLite table, one transaction per batch"""
+    def __init__(self, db_path, **kwargs):
+        kwargs.setdefault("batch_size", 50)
+        super().__init__("sqlite", **kwargs)
+        self.db_path = db_path
+        self.conn = None
+
+    def open(self):
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Connection is created and used only on the sink thread
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS events ("
+            "timestamp REAL, event_type TEXT, obj_id INTEGER, zone TEXT, x INTEGER, y INTEGER, published_at REAL)"
+        )
+        # Databases created before published_at was recorded
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(events)")}
+        if "published_at" not in columns:
+            self.conn.execute("ALTER TABLE events ADD COLUMN published_at REAL")
+        self.conn.commit()
+
+    def handle_batch(self, events):
+        rows = []
+        for event in events:
+            x, y = event.location if event.location else (None, None)
+            rows.append((event.timestamp, event.event_type, event.obj_id, event.zone, x, y, event.published_at))
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO events (timestamp, event_type, obj_id, zone, x, y, published_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def close(self):
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+
+class WebhookSink(EventSink):
+    """POSTs each batch as a JSON list to a URL"""
+    def __init__(self, url, timeout=5.0, **kwargs):
+        kwargs.setdefault("batch_size", 20)
+        kwargs.setdefault("flush_interval", 2.0)
+        super().__init__("webhook", **kwargs)
+        self.url = url
+        self.timeout = timeout
+        self.session = None
+
+    def open(self):
+        self.session = requests.Session()
+
+    def handle_batch(self, events):
+        response = self.session.post(self.url, json=[event.to_dict() for event in events], timeout=self.timeout)
+        response.raise_for_status()
+
+    def close(self):
+        if self.session:
+            self.session.close()
+            self.session = None
+
+class EventBus:
+    """Fans published events out to independent sinks"""
+    def __init__(self):
+        self.sinks = []
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+        return sink
+
+    def publish(self, event):
+        for sink in self.sinks:
+            sink.offer(event)
+
+    def start(self):
+        for sink in self.sinks:
+            sink.start()
+
+    def stop(self, timeout=5.0):
+        """Stop all sinks, waiting at most timeout seconds in total"""
+        for sink in self.sinks:
+            sink.request_stop()
+        deadline = time.time() + timeout
+        for sink in self.sinks:
+            sink.join(max(0.0, deadline - time.time()))
+
+    def metrics(self):
+        return {sink.name: sink.metrics() for sink in self.sinks}
+
+def _sink_options(sink_config):
+    options = {}
+    for key in ("batch_size", "flush_interval", "max_queue", "drop_policy"):
+        if key in sink_config:
+            options[key] = sink_config[key]
+    return options
+
+def build_event_bus(config, event_logger, callback):
+    """Create an EventBus from the detection config's 'events' section"""
+    events_config = config.get("events", {})
+    bus = EventBus()
+    
+    file_config = events_config.get("file", {})
+    if file_config.get("enabled", True):
+        bus.add_sink(LoggerSink(event_logger, **_sink_options(file_config)))
+    
+    gui_config = events_config.get("gui", {})
+    if gui_config.get("enabled", True):
+        bus.add_sink(CallbackSink(callback, name="gui", **_sink_options(gui_config)))
+    
+    sqlite_config = events_config.get("sqlite", {})
+    if sqlite_config.get("enabled", False):
+        bus.add_sink(SQLiteSink(sqlite_config.get("path", "logs/events.db"), **_sink_options(sqlite_config)))
+    
+    webhook_config = events_config.get("webhook", {})
+    if webhook_config.get("enabled", False):
+        bus.add_sink(WebhookSink(
+            webhook_config["url"],
+            timeout=webhook_config.get("timeout", 5.0),
+            **_sink_options(webhook_config)
+        ))
+    
+    return bus
@@ -1,18 +1,68 @@
 #zone_intrusion_detector\src\gui.py
 import os
 import json
+import logging
 import cv2
 import numpy as np
-from PyQt5.QtCore import Qt, QTimer, QPoint, QSize
+from PyQt5.QtCore import Qt, QTimer, QPoint, QSize, QThread, pyqtSignal
 from PyQt5.QtGui import QImage, QPixmap, QPainter, QPen, QColor, QBrush, QPolygon, QFont
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
     QListWidget, QFileDialog, QMessageBox, QInputDialog, QGroupBox, QStatusBar
 )
-from src.detection_engine import DetectionEngine
 from src.zone_manager import ZoneManager
 from src.logger import EventLogger
 
+LOADER_SHUTDOWN_TIMEOUT_MS = 3000
+# Loaders still running at shutdown; kept referenced so Qt does not destroy a live thread
+_detached_loaders = []
+
+class DetectionLoader(QThread):
+    """Imports the detection stack and builds a DetectionEngine off the GUI thread"""
+    progress = pyqtSignal(str)
+    loaded = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, zone_manager, event_logger, config, frame_shape=None, parent=None):
+        super().__init__(parent)
+        self.frame_shape = frame_shape
+        self.zone_manager = zone_manager
+        self.event_logger = event_logger
+        self.config = config
+        self.engine = None
+
+    def run(self):
+        try:
+            self.progress.emit("Loading detection libraries...")
+            # Deferred so torch/ultralytics are never imported unless detection is used
+            from src.detection_engine import DetectionEngine
+
+            # Loads and warms the model on first use; cached for later sessions
+            self.progress.emit(f"Loading model {os.path.basename(self.config['model'])}...")
+            engine = DetectionEngine(
+                self.zone_manager,
+                self.event_logger,
+                self.config,
+                frame_shape=self.frame_shape
+            )
+            self.engine = engine
+            self.loaded.emit(engine)
+        except Exception as e:
+            self.failed.emit(str(e))
+
+class TestVideoLoader(QThread):
+    """Downloads the sample video off the GUI thread"""
+    loaded = pyqtSignal(str)
+    failed = pyqtSignal(str)
+
+    def run(self):
+        from src.model_utils import download_test_video
+        path = download_test_video()
+        if os.path.exists(path):
+            self.loaded.emit(path)
+        else:
+            self.failed.emit("Test video unavailable (offline?)")
+
 class VideoWidget(QLabel):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -56,14 +106,19 @@ class VideoWidget(QLabel):
         return point
 
 class MainWindow(QMainWindow):
+    # Engine events arrive on an event-bus thread; the signal queues them onto the GUI thread
+    event_received = pyqtSignal(str)
+
     def __init__(self, settings, zone_colors, event_logger, parent=None):
         super().__init__(parent)
         self.settings = settings
         self.zone_colors = zone_colors
         self.zone_manager = ZoneManager()
         self.event_logger = event_logger  # Store event logger
+        self.app_logger = logging.getLogger(__name__)
         self.init_ui()
         self.init_state()
+        self.event_received.connect(self.add_event_to_list)
         self.test_video_loaded = False
         
 
@@ -166,20 +221,36 @@ class MainWindow(QMainWindow):
         self.drawing = False
         self.current_polygon = []
         self.detection_engine = None
+        self.detection_loader = None
+        self.video_loader = None
+        self.closing = False
         self.update_zone_list()
-        from src.model_utils import download_test_video
-        download_test_video()
 
     def open_video(self):
+        if self.video_loader is not None:
+            return  # Test video still downloading
+        
         if not self.test_video_loaded:
-            from src.model_utils import download_test_video
-            path = download_test_video()
             self.test_video_loaded = True
-        else:
-            path, _ = QFileDialog.getOpenFileName(
-                self, "Open Video", "", "Video Files (*.mp4 *.avi *.mov)"
-            )
+            self.video_loader = TestVideoLoader(self)
+            self.video_loader.loaded.connect(self.load_video)
+            self.video_loader.failed.connect(self.status_bar.showMessage)
+            self.video_loader.finished.connect(self.on_video_loader_finished)
+            self.btn_open.setEnabled(False)
+            self.status_bar.showMessage("Fetching test video...")
+            self.video_loader.start()
+            return
+        
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Open Video", "", "Video Files (*.mp4 *.avi *.mov)"
+        )
+        self.load_video(path)
+
+    def on_video_loader_finished(self):
+        self.video_loader = None
+        self.btn_open.setEnabled(True)
 
+    def load_video(self, path):
         if path:
             self.video_path = path
             self.cap = cv2.VideoCapture(path)
@@ -207,30 +278,65 @@ class MainWindow(QMainWindow):
             self.play_video()
 
     def toggle_detection(self):
+        if self.detection_loader is not None:
+            return  # Model still loading
+        
         if not self.detecting:
             if not self.zone_manager.zones:
                 QMessageBox.warning(self, "No Zones", "Please define at least one zone first")
                 return
             
-            self.detection_engine = DetectionEngine(
-                self.video_path,
+            frame_shape = None
+            if self.cap and self.cap.isOpened():
+                frame_shape = (
+                    int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                    int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+                )
+            
+            self.detection_loader = DetectionLoader(
                 self.zone_manager,
                 self.event_logger,  # Pass the event logger
-                self.settings["detection"]
+                self.settings["detection"],
+                frame_shape=frame_shape if all(frame_shape or ()) else None,
+                parent=self
             )
-
-            self.detecting = True
-            self.btn_detect.setText("Stop Detection")
+            self.detection_loader.progress.connect(self.status_bar.showMessage)
+            self.detection_loader.loaded.connect(self.on_detection_loaded)
+            self.detection_loader.failed.connect(self.on_detection_failed)
+            self.detection_loader.finished.connect(self.on_loader_finished)
+            
+            self.btn_detect.setEnabled(False)
+            self.btn_detect.setText("Loading...")
             self.btn_draw.setEnabled(False)
-            self.status_bar.showMessage("Detection running...")
-            self.detection_engine.set_gui_callback(self.add_event_to_list)
+            self.detection_loader.start()
         else:
             self.detecting = False
+            if self.detection_engine:
+                self.detection_engine.cleanup()
             self.detection_engine = None
             self.btn_detect.setText("Start Detection")
             self.btn_draw.setEnabled(True)
             self.status_bar.showMessage("Detection stopped")
 
+    def on_detection_loaded(self, engine):
+        if self.closing:
+            return  # closeEvent already cleaned this engine up
+        self.detection_engine = engine
+        self.detection_engine.set_gui_callback(self.event_received.emit)
+        self.detecting = True
+        self.btn_detect.setText("Stop Detection")
+        self.status_bar.showMessage("Detection running...")
+
+    def on_detection_failed(self, error):
+        self.app_logger.error(f"Detection initialization failed: {error}")
+        self.btn_detect.setText("Start Detection")
+        self.btn_draw.setEnabled(True)
+        self.status_bar.showMessage(f"Detection failed to start: {error}")
+
+    def on_loader_finished(self):
+        self.detection_loader = None
+        self.btn_detect.setEnabled(True)
+
 
     def add_event_to_list(self, event_text):
         self.event_list.addItem(event_text)
@@ -329,7 +435,28 @@ class MainWindow(QMainWindow):
         self.update_zone_list()
         self.status_bar.showMessage("All zones cleared")
 
+    def stop_loader(self, loader):
+        """Cancel downloads and wait a bounded time; returns True if the loader finished"""
+        if loader.wait(LOADER_SHUTDOWN_TIMEOUT_MS):
+            return True
+        self.app_logger.warning(f"{type(loader).__name__} still running at shutdown, leaving it to finish")
+        loader.setParent(None)
+        _detached_loaders.append(loader)
+        return False
+
     def closeEvent(self, event):
+        self.closing = True
+        if self.video_loader is not None or self.detection_loader is not None:
+            from src.model_utils import download_cancelled
+            download_cancelled.set()
+            self.status_bar.showMessage("Cancelling downloads...")
+        if self.video_loader is not None:
+            self.stop_loader(self.video_loader)
+        if self.detection_loader is not None and self.stop_loader(self.detection_loader):
+            # The queued 'loaded' signal will not be delivered once the window closes
+            engine = self.detection_loader.engine
+            if engine is not None and engine is not self.detection_engine:
+                engine.cleanup()
         if self.cap:
             self.cap.release()
         if self.detection_engine:
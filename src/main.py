@@ -18,10 +18,6 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
-# PyTorch compatibility
-import torch
-torch.set_float32_matmul_precision('high')
-
 def load_config():
     try:
         with open("config/settings.yaml", "r") as f:
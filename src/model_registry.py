@@ -0,0 +1,76 @@
+#zone_intrusion_detector\src\model_registry.py
+import os
+import threading
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Process-wide cache: (model_path, backend, device) -> loaded model
+_models = {}
+# Per cached model: (frame shape, imgsz) combinations already warmed up
+_warmed = {}
+_lock = threading.Lock()
+
+def _load_ultralytics(model_path, device):
+    # Imported lazily so torch/ultralytics are only loaded when a model is requested
+    import torch
+    from ultralytics import YOLO
+    from src.model_utils import ensure_model
+
+    torch.set_float32_matmul_precision('high')
+    model_dir = os.path.dirname(model_path)
+    if model_dir:
+        os.makedirs(model_dir, exist_ok=True)
+    # Resumable download + cached checksum for the default checkpoint
+    model_path = ensure_model(model_path)
+    model = YOLO(model_path, task='detect')
+    if device is not None:
+        model.to(device)
+    return model
+
+_LOADERS = {
+    "ultralytics": _load_ultralytics,
+}
+
+def get_model(model_path, backend="ultralytics", device=None, warmup_runs=1,
+              frame_shape=None, imgsz=640, classes=None):
+    """Return a cached model, loading it on first use.
+
+    The model is warmed up once per (frame_shape, imgsz): frames of a new
+    size letterbox to a different input shape, which on CUDA/cuDNN takes
+    its own slow first pass.
+    """
+    key = (os.path.abspath(model_path), backend, device)
+    frame_shape = tuple(frame_shape[:2]) if frame_shape else (imgsz, imgsz)
+    with _lock:
+        model = _models.get(key)
+        if model is None:
+            if backend not in _LOADERS:
+                raise ValueError(f"Unsupported model backend: {backend}")
+
+            logger.info(f"Loading {backend} model: {model_path} (device={device})")
+            model = _LOADERS[backend](model_path, device)
+            _models[key] = model
+            _warmed[key] = set()
+
+        if (frame_shape, imgsz) not in _warmed[key]:
+            warmup(model, device, warmup_runs, frame_shape, imgsz, classes)
+            _warmed[key].add((frame_shape, imgsz))
+        return model
+
+def warmup(model, device=None, runs=1, frame_shape=(640, 640), imgsz=640, classes=None):
+    """Run dummy inference at the real frame shape so the first frame runs at steady-state speed"""
+    if runs <= 0:
+        return
+    height, width = frame_shape
+    dummy = np.zeros((height, width, 3), dtype=np.uint8)
+    for _ in range(runs):
+        model(dummy, imgsz=imgsz, classes=classes, device=device, verbose=False)
+    logger.info(f"Model warm-up done ({runs} run(s) at {width}x{height}, imgsz={imgsz})")
+
+def clear():
+    """Drop all cached models"""
+    with _lock:
+        _models.clear()
+        _warmed.clear()
@@ -1,5 +1,8 @@
 #zone_intrusion_detector\src\model_utils.py
 import os
+import json
+import mmap
+import threading
 import requests
 import hashlib
 from tqdm import tqdm
@@ -9,52 +12,99 @@ import logging
 MODEL_URL = "https://github.com/ultralytics/assets/releases/download/v0.0.0/yolov8n.pt"
 MODEL_MD5 = "0305608151dd1725c9d7da6882ae52d5"
 
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB chunks
+HASH_CHUNK_SIZE = 8 * 1024 * 1024  # 8MB slices of the memory map
+VERIFY_CACHE_SUFFIX = ".verify.json"
+
+# Set on shutdown so in-flight downloads stop at the next chunk (partial files are kept for resume)
+download_cancelled = threading.Event()
+
 logger = logging.getLogger(__name__)
 
 def get_model_path(config):
     """Get model path and ensure it exists with correct checksum"""
-    model_path = config["detection"]["model"]
+    return ensure_model(config["detection"]["model"])
+
+def ensure_model(model_path, url=MODEL_URL, expected_digest=MODEL_MD5):
+    """Download (resuming) and verify the model if it is the known checkpoint.
+
+    Other checkpoints are returned untouched and left to the model loader.
+    An existing file is only replaced by a download that has already passed
+    verification; if no verified copy can be fetched it is kept and used.
+    """
+    if os.path.basename(model_path) != os.path.basename(url):
+        return model_path
+    
     model_dir = os.path.dirname(model_path)
     
     # Create directory if needed
-    os.makedirs(model_dir, exist_ok=True)
-    
-    # Download if file doesn't exist
-    if not os.path.exists(model_path):
-        download_model(MODEL_URL, model_path)
+    if model_dir:
+        os.makedirs(model_dir, exist_ok=True)
     
-    # Verify model integrity
-    if not verify_model(model_path):
+    # Verify model integrity (cached by size and mtime)
+    if os.path.exists(model_path):
+        if verify_model(model_path, expected_digest):
+            return model_path
         logger.error("Model verification failed. Re-downloading...")
-        os.remove(model_path)
-        download_model(MODEL_URL, model_path)
-        
-        if not verify_model(model_path):
-            raise RuntimeError("Failed to download valid model file")
+    
+    try:
+        # A mismatching download is discarded, so the next attempt starts clean
+        download_model(url, model_path, expected_digest)
+    except RuntimeError:
+        if os.path.exists(model_path):
+            logger.warning(f"Could not fetch a verified model; using existing {model_path}")
+            return model_path
+        raise
     
     return model_path
 
-def download_model(url, save_path):
-    """Download model with progress bar - Windows compatible"""
+def download_model(url, save_path, expected_digest=None, algorithm="md5"):
+    """Download model with progress bar, resuming from a partial '.part' file - Windows compatible.
+
+    With expected_digest, the finished '.part' file is verified before it
+    replaces save_path; on mismatch it is discarded and RuntimeError raised.
+    """
     logger.info(f"Downloading model from {url}...")
+    part_path = save_path + ".part"
     try:
-        response = requests.get(url, stream=True)
-        response.raise_for_status()
+        resume_from = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {"Range": f"bytes={resume_from}-"} if resume_from else {}
+        response = requests.get(url, stream=True, headers=headers, timeout=30)
         
-        total_size = int(response.headers.get('content-length', 0))
-        block_size = 1024  # 1KB chunks
+        if response.status_code == 416:
+            # Range not satisfiable: the partial file is already complete
+            response.close()
+        else:
+            response.raise_for_status()
+            if response.status_code != 206:
+                resume_from = 0  # Server ignored the range request, start over
+            else:
+                logger.info(f"Resuming download at {resume_from} bytes")
+            
+            total_size = resume_from + int(response.headers.get('content-length', 0))
+            
+            with open(part_path, 'ab' if resume_from else 'wb') as f:
+                with tqdm(
+                    total=total_size,
+                    initial=resume_from,
+                    unit='iB',
+                    unit_scale=True,
+                    unit_divisor=1024,
+                    desc=f"Downloading {os.path.basename(save_path)}"
+                ) as bar:
+                    for data in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                        if download_cancelled.is_set():
+                            raise RuntimeError("Download cancelled")
+                        bar.update(len(data))
+                        f.write(data)
         
-        with open(save_path, 'wb') as f:
-            with tqdm(
-                total=total_size,
-                unit='iB',
-                unit_scale=True,
-                unit_divisor=1024,
-                desc=f"Downloading {os.path.basename(save_path)}"
-            ) as bar:
-                for data in response.iter_content(block_size):
-                    bar.update(len(data))
-                    f.write(data)
+        if expected_digest:
+            digest = hash_file(part_path, algorithm)
+            if digest != expected_digest:
+                os.remove(part_path)
+                raise RuntimeError(f"Downloaded {algorithm} mismatch: expected {expected_digest}, got {digest}")
+        
+        os.replace(part_path, save_path)
         logger.info("Download completed successfully")
     except Exception as e:
         logger.error(f"Download failed: {str(e)}")
@@ -68,35 +118,74 @@ def download_test_video():
     if not os.path.exists(video_path):
         print("Downloading test video...")
         try:
-            response = requests.get(video_url, stream=True)
+            response = requests.get(video_url, stream=True, timeout=10)
             response.raise_for_status()
             
-            total_size = int(response.headers.get('content-length', 0))
-            block_size = 1024  # 1KB chunks
-            
-            with open(video_path, 'wb') as f:
-                for data in response.iter_content(block_size):
+            # Written to a temporary file so an interrupted download is never mistaken for the video
+            part_path = video_path + ".part"
+            with open(part_path, 'wb') as f:
+                for data in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                    if download_cancelled.is_set():
+                        raise RuntimeError("Download cancelled")
                     f.write(data)
+            os.replace(part_path, video_path)
             print("Test video downloaded successfully")
         except Exception as e:
             print(f"Failed to download test video: {str(e)}")
     return video_path
 
-def verify_model(model_path):
-    """Verify model integrity using MD5 checksum"""
-    if not MODEL_MD5:
-        return True  # Skip verification if no MD5 provided
+def hash_file(file_path, algorithm="md5"):
+    """Hash a file through large memory-mapped slices (algorithm: any hashlib name, e.g. 'blake2b')"""
+    file_hash = hashlib.new(algorithm)
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return file_hash.hexdigest()  # mmap cannot map empty files
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                for offset in range(0, len(mm), HASH_CHUNK_SIZE):
+                    file_hash.update(view[offset:offset + HASH_CHUNK_SIZE])
+            finally:
+                view.release()
+    return file_hash.hexdigest()
+
+def cached_file_digest(file_path, algorithm="md5"):
+    """Return the file digest, rehashing only if size or mtime changed since the last call"""
+    stat = os.stat(file_path)
+    cache_path = file_path + VERIFY_CACHE_SUFFIX
+    
+    cache = {}
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, "r") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+    
+    if cache.get("size") != stat.st_size or cache.get("mtime_ns") != stat.st_mtime_ns:
+        cache = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "digests": {}}
+    
+    digest = cache["digests"].get(algorithm)
+    if digest is None:
+        digest = hash_file(file_path, algorithm)
+        cache["digests"][algorithm] = digest
+        try:
+            with open(cache_path, "w") as f:
+                json.dump(cache, f)
+        except OSError as e:
+            logger.warning(f"Could not write verification cache: {str(e)}")
+    
+    return digest
+
+def verify_model(model_path, expected_digest=MODEL_MD5, algorithm="md5"):
+    """Verify model integrity against a checksum (MD5 by default), using the verification cache"""
+    if not expected_digest:
+        return True  # Skip verification if no checksum provided
     
     try:
-        # Calculate file MD5
-        md5_hash = hashlib.md5()
-        with open(model_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                md5_hash.update(chunk)
-        
-        file_md5 = md5_hash.hexdigest()
-        if file_md5 != MODEL_MD5:
-            logger.warning(f"Model MD5 mismatch: expected {MODEL_MD5}, got {file_md5}")
+        file_digest = cached_file_digest(model_path, algorithm)
+        if file_digest != expected_digest:
+            logger.warning(f"Model {algorithm} mismatch: expected {expected_digest}, got {file_digest}")
             return False
             
         return True
@@ -13,7 +13,9 @@ class CentroidTracker:
         self.centroid_history = {}
         
     def update(self, detections):
+        """Update tracks from an (N, 6) array of [x1, y1, x2, y2, cls_id, conf]"""
         current_objects = {}
+        detections = np.asarray(detections, dtype=np.float32).reshape(-1, 6)
         
         if len(detections) == 0:
             for obj_id in list(self.disappeared.keys()):
@@ -22,12 +24,11 @@ class CentroidTracker:
                     self.deregister(obj_id)
             return current_objects
         
-        centroids = np.zeros((len(detections), 2), dtype="int")
-        
-        for (i, (x1, y1, x2, y2, cls_id, conf)) in enumerate(detections):
-            cx = (x1 + x2) // 2
-            cy = (y1 + y2) // 2
-            centroids[i] = (cx, cy)
+        boxes = detections[:, :4].astype(int)
+        centroids = np.column_stack((
+            (boxes[:, 0] + boxes[:, 2]) // 2,
+            (boxes[:, 1] + boxes[:, 3]) // 2
+        ))
         
         if len(self.objects) == 0:
             for i in range(len(centroids)):
@@ -70,8 +71,8 @@ class CentroidTracker:
                 self.objects[obj_id]["centroid"] = smoothed_centroid
                 self.objects[obj_id]["centroid_x"] = smoothed_centroid[0]  # FIX: Update centroid_x
                 self.objects[obj_id]["centroid_y"] = smoothed_centroid[1]  # FIX: Update centroid_y
-                self.objects[obj_id]["bbox"] = detections[col][:4]
-                self.objects[obj_id]["class_id"] = detections[col][4]
+                self.objects[obj_id]["bbox"] = tuple(boxes[col].tolist())
+                self.objects[obj_id]["class_id"] = int(detections[col, 4])
                 self.disappeared[obj_id] = 0
                 current_objects[obj_id] = self.objects[obj_id]
                 
@@ -99,9 +100,9 @@ class CentroidTracker:
             "centroid": centroid,
             "centroid_x": centroid[0],  # Initialize centroid_x
             "centroid_y": centroid[1],  # Initialize centroid_y
-            "bbox": detection[:4],
-            "class_id": detection[4],
-            "confidence": detection[5],
+            "bbox": tuple(int(v) for v in detection[:4]),
+            "class_id": int(detection[4]),
+            "confidence": float(detection[5]),
             "zones": set()
         }
         self.disappeared[self.next_id] = 0
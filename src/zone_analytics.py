@@ -0,0 +1,122 @@
+#zone_intrusion_detector\src\zone_analytics.py
+import os
+import json
+import time
+import bisect
+import logging
+from collections import OrderedDict
+
+class ZoneAnalytics:
+    """Incremental per-zone occupancy, dwell-time histograms and peak counts.
+
+    Every ENTRY/EXIT updates the aggregates in O(1) (O(log bins) for the
+    histogram), so snapshots never need to re-scan the event history.
+    """
+    def __init__(self, dwell_bins=(1, 5, 10, 30, 60, 300, 600), bucket_seconds=60,
+                 max_buckets=1440, persist_path=None, persist_interval=30):
+        self.dwell_bins = list(dwell_bins)  # Upper edges in seconds; last bin is open-ended
+        self.bucket_seconds = bucket_seconds
+        self.max_buckets = max_buckets
+        self.persist_path = persist_path
+        self.persist_interval = persist_interval
+        self.app_logger = logging.getLogger(__name__)
+        
+        self.occupancy = {}        # zone -> objects currently inside
+        self.total_entries = {}    # zone -> entries since start
+        self.dwell_histograms = {} # zone -> counts per dwell bin
+        self.peaks = OrderedDict() # bucket start -> {zone: peak occupancy}
+        self.entry_times = {}      # (obj_id, zone) -> entry timestamp
+        self.last_persist = time.time()
+        if persist_path and os.path.exists(persist_path):
+            self.restore()
+    
+    def restore(self):
+        """Carry totals, dwell histograms and peaks over from the persisted snapshot.
+
+        Occupancy is not restored: tracks do not survive a restart, so
+        objects still inside would never see an EXIT.
+        """
+        try:
+            with open(self.persist_path, "r") as f:
+                snapshot = json.load(f)
+            self.total_entries = {zone: int(count) for zone, count in snapshot.get("total_entries", {}).items()}
+            if snapshot.get("dwell_bins") == self.dwell_bins:
+                self.dwell_histograms = {
+                    zone: list(counts) for zone, counts in snapshot.get("dwell_histograms", {}).items()
+                }
+            else:
+                self.app_logger.warning("Dwell bins changed; not restoring dwell histograms")
+            if snapshot.get("bucket_seconds") == self.bucket_seconds:
+                buckets = sorted(snapshot.get("peaks", {}).items(), key=lambda item: float(item[0]))
+                for bucket, zones in buckets[-self.max_buckets:]:
+                    self.peaks[int(float(bucket))] = dict(zones)
+            else:
+                self.app_logger.warning("Peak bucket size changed; not restoring peaks")
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            self.app_logger.error(f"Failed to restore zone analytics: {str(e)}")
+            self.total_entries = {}
+            self.dwell_histograms = {}
+            self.peaks = OrderedDict()
+    
+    def on_entry(self, obj_id, zone, timestamp):
+        if (obj_id, zone) in self.entry_times:
+            return
+        self.entry_times[(obj_id, zone)] = timestamp
+        self.occupancy[zone] = self.occupancy.get(zone, 0) + 1
+        self.total_entries[zone] = self.total_entries.get(zone, 0) + 1
+        self._update_peak(zone, timestamp)
+    
+    def on_exit(self, obj_id, zone, timestamp):
+        entry_time = self.entry_times.pop((obj_id, zone), None)
+        if entry_time is None:
+            return
+        # Record the pre-exit count so a bucket that only sees this exit still shows it
+        self._update_peak(zone, timestamp)
+        self.occupancy[zone] -= 1
+        
+        histogram = self.dwell_histograms.setdefault(zone, [0] * (len(self.dwell_bins) + 1))
+        histogram[bisect.bisect_left(self.dwell_bins, timestamp - entry_time)] += 1
+    
+    def _update_peak(self, zone, timestamp):
+        bucket = int(timestamp // self.bucket_seconds) * self.bucket_seconds
+        bucket_peaks = self.peaks.get(bucket)
+        if bucket_peaks is None:
+            # Seed a new bucket with the occupancy carried over from earlier buckets
+            bucket_peaks = {z: count for z, count in self.occupancy.items() if count}
+            self.peaks[bucket] = bucket_peaks
+            while len(self.peaks) > self.max_buckets:
+                self.peaks.popitem(last=False)
+        bucket_peaks[zone] = max(bucket_peaks.get(zone, 0), self.occupancy[zone])
+    
+    def snapshot(self):
+        """Return a JSON-serializable copy of the current aggregates"""
+        return {
+            "timestamp": time.time(),
+            "occupancy": dict(self.occupancy),
+            "total_entries": dict(self.total_entries),
+            "dwell_bins": list(self.dwell_bins),
+            "dwell_histograms": {zone: list(counts) for zone, counts in self.dwell_histograms.items()},
+            "bucket_seconds": self.bucket_seconds,
+            "peaks": {str(bucket): dict(zones) for bucket, zones in self.peaks.items()}
+        }
+    
+    def maybe_persist(self, now=None):
+        """Persist the snapshot if persist_interval has elapsed since the last write"""
+        now = time.time() if now is None else now
+        if self.persist_path and now - self.last_persist >= self.persist_interval:
+            self.persist()
+    
+    def persist(self):
+        if not self.persist_path:
+            return
+        self.last_persist = time.time()
+        try:
+            directory = os.path.dirname(self.persist_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = self.persist_path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.snapshot(), f, indent=2)
+            os.replace(tmp_path, self.persist_path)
+        except OSError as e:
+            self.app_logger.error(f"Failed to persist zone analytics: {str(e)}")
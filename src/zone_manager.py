@@ -2,10 +2,14 @@
 import json
 import os
 from shapely.geometry import Point, Polygon
+from shapely.prepared import prep
+from shapely.strtree import STRtree
 
 class ZoneManager:
     def __init__(self):
         self.zones = []  # Format: [{"label": str, "points": list, "color": str, "polygon": shapely.Polygon}]
+        self._index = None  # STRtree over zone polygons, rebuilt when zones change
+        self._prepared = []  # Prepared polygons, aligned with self.zones
         
     def add_zone(self, label, points, color):
         polygon = Polygon(points)
@@ -15,14 +19,19 @@ class ZoneManager:
             "color": color,
             "polygon": polygon
         })
+        self._rebuild_index()
     
     def point_in_zones(self, point):
         """Return set of zone labels containing the point"""
-        p = Point(point)
         containing_zones = set()
-        for zone in self.zones:
-            if zone["polygon"].contains(p):
-                containing_zones.add(zone["label"])
+        if self._index is None:
+            return containing_zones
+        
+        p = Point(point)
+        # Bounding-box lookup first, exact test only on candidate zones
+        for idx in self._index.query(p):
+            if self._prepared[idx].contains(p):
+                containing_zones.add(self.zones[idx]["label"])
         return containing_zones
     
     def save_zones(self, file_path):
@@ -54,6 +63,14 @@ class ZoneManager:
                 "color": zone["color"],
                 "polygon": polygon
             })
+        self._rebuild_index()
     
     def clear_zones(self):
-        self.zones = []
\ No newline at end of file
+        self.zones = []
+        self._rebuild_index()
+    
+    def _rebuild_index(self):
+        """Rebuild the spatial index and prepared geometries from self.zones"""
+        polygons = [zone["polygon"] for zone in self.zones]
+        self._prepared = [prep(polygon) for polygon in polygons]
+        self._index = STRtree(polygons) if polygons else None
@@ -0,0 +1,26 @@
+import threading
+from http.server import HTTPServer
+import pytest
+
+@pytest.fixture
+def stub_server():
+    """Start local HTTP stub servers: stub_server(handler, path, **attrs) -> (url, handler_class).
+
+    Each call serves a fresh subclass of handler with attrs set as class
+    attributes, so per-test state (status codes, recorded requests) never
+    leaks between tests.
+    """
+    servers = []
+
+    def start(handler, path="/", **attrs):
+        handler_class = type(handler.__name__, (handler,), dict(attrs))
+        httpd = HTTPServer(("127.0.0.1", 0), handler_class)
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        servers.append(httpd)
+        return f"http://127.0.0.1:{httpd.server_address[1]}{path}", handler_class
+
+    yield start
+    for httpd in servers:
+        httpd.shutdown()
+        httpd.server_close()
@@ -0,0 +1,67 @@
+import os
+import threading
+from datetime import datetime
+import numpy as np
+from src.clip_recorder import ClipRecorder
+from src.event_bus import ZoneEvent
+
+FRAME = np.zeros((120, 160, 3), dtype=np.uint8)
+FRAME_MB = FRAME.nbytes / (1024 * 1024)
+
+def feed(recorder, start, count, fps=10.0):
+    for i in range(count):
+        recorder.add_frame(FRAME, start + i / fps)
+
+def test_clip_written_with_pre_and_post_frames(tmp_path):
+    recorder = ClipRecorder(output_dir=str(tmp_path), pre_seconds=1.0, post_seconds=1.0)
+    feed(recorder, 0.0, 20)
+    recorder.trigger(ZoneEvent("ENTRY", 1, "zone1", (10, 10), 1.95))
+    feed(recorder, 2.0, 20)
+    recorder.close()
+
+    metrics = recorder.metrics()
+    assert metrics["clips_written"] == 1
+    assert metrics["truncated_clips"] == 0
+    assert metrics["pending_bytes"] == 0
+    # Named by wall-clock time, not the 1970 date of a video-position timestamp
+    [name] = os.listdir(tmp_path)
+    assert name.startswith(datetime.now().strftime("%Y%m%d"))
+
+def test_ring_buffer_capped_by_bytes(tmp_path):
+    recorder = ClipRecorder(output_dir=str(tmp_path), max_buffer_frames=1000, max_buffer_mb=10 * FRAME_MB)
+    feed(recorder, 0.0, 50)
+    recorder.close()
+
+    assert len(recorder.buffer) == 10
+    assert recorder.buffer_bytes <= recorder.max_buffer_bytes
+
+class StalledRecorder(ClipRecorder):
+    """Encoder waits for release, so queued frames stay counted against the budget"""
+    def __init__(self, *args, **kwargs):
+        self.release = threading.Event()
+        super().__init__(*args, **kwargs)
+
+    def _encode_loop(self):
+        self.release.wait(10)
+        super()._encode_loop()
+
+def test_clip_truncated_and_dropped_when_encoder_budget_exceeded(tmp_path):
+    recorder = StalledRecorder(output_dir=str(tmp_path), pre_seconds=1.0, post_seconds=60.0,
+                               max_pending_mb=5 * FRAME_MB)
+    feed(recorder, 0.0, 3)
+    recorder.trigger(ZoneEvent("ENTRY", 1, "zone1", (10, 10), 0.25))
+    feed(recorder, 0.3, 3)  # Frames 4 and 5 fit, frame 6 is over budget
+
+    assert recorder.truncated_clips == 1
+    assert recorder.active_clip is None
+    assert recorder.pending_bytes <= recorder.max_pending_bytes
+
+    # Encoder still backed up: no pre-event frame fits, so the next clip is dropped
+    recorder.trigger(ZoneEvent("ENTRY", 2, "zone1", (10, 10), 0.6))
+    assert recorder.dropped_clips == 1
+    assert recorder.active_clip is None
+
+    recorder.release.set()
+    recorder.close()
+    assert recorder.clips_written == 1
+    assert recorder.pending_bytes == 0
@@ -0,0 +1,79 @@
+import numpy as np
+from src.detection_engine import DetectionEngine
+from src.tracker import CentroidTracker
+
+class FakeTensor:
+    def __init__(self, array):
+        self.array = np.asarray(array, dtype=np.float32)
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.array
+
+class FakeBoxes:
+    def __init__(self, data):
+        self.data = FakeTensor(np.asarray(data, dtype=np.float32).reshape(-1, len(data[0]) if len(data) else 6))
+
+    def __len__(self):
+        return len(self.data.array)
+
+class FakeResult:
+    def __init__(self, data):
+        self.boxes = FakeBoxes(data)
+
+# [x1, y1, x2, y2, conf, cls]
+BOXES = [
+    [10.7, 20.2, 50.9, 80.4, 0.91, 0],
+    [300.0, 100.5, 340.2, 220.8, 0.55, 2],
+]
+
+def old_per_box_detections(rows):
+    """The pre-vectorized extraction: one tuple per box"""
+    return [(int(r[0]), int(r[1]), int(r[2]), int(r[3]), int(r[5]), float(r[4])) for r in rows]
+
+def test_extracts_six_column_layout():
+    detections = DetectionEngine.extract_detections([FakeResult(BOXES)])
+    assert detections.dtype == np.float32
+    assert detections.shape == (2, 6)
+    np.testing.assert_allclose(detections[:, 4], [0, 2])
+    np.testing.assert_allclose(detections[:, 5], [0.91, 0.55], rtol=1e-6)
+    np.testing.assert_allclose(detections[:, :4], np.array(BOXES, dtype=np.float32)[:, :4])
+
+def test_extracts_tracked_seven_column_layout():
+    # [x1, y1, x2, y2, track_id, conf, cls]
+    tracked = [row[:4] + [7] + row[4:] for row in BOXES]
+    detections = DetectionEngine.extract_detections([FakeResult(tracked)])
+    np.testing.assert_array_equal(detections, DetectionEngine.extract_detections([FakeResult(BOXES)]))
+
+def test_empty_and_multiple_results():
+    empty = DetectionEngine.extract_detections([FakeResult([])])
+    assert empty.shape == (0, 6)
+    assert DetectionEngine.extract_detections([]).shape == (0, 6)
+
+    combined = DetectionEngine.extract_detections([FakeResult(BOXES[:1]), FakeResult([]), FakeResult(BOXES[1:])])
+    assert combined.shape == (2, 6)
+
+def test_tracker_matches_old_per_box_path():
+    vectorized = CentroidTracker()
+    per_box = CentroidTracker()
+    frames = [BOXES, [[r[0] + 4.3, r[1] + 2.6, r[2] + 4.3, r[3] + 2.6, r[4], r[5]] for r in BOXES]]
+    for rows in frames:
+        new_objects = vectorized.update(DetectionEngine.extract_detections([FakeResult(rows)]))
+        old_objects = per_box.update(old_per_box_detections(rows))
+        assert new_objects.keys() == old_objects.keys()
+        for obj_id in new_objects:
+            new, old = new_objects[obj_id], old_objects[obj_id]
+            assert tuple(int(v) for v in new["centroid"]) == tuple(int(v) for v in old["centroid"])
+            assert tuple(new["bbox"]) == tuple(old["bbox"])
+            assert new["class_id"] == old["class_id"]
+
+def test_tracker_bbox_and_centroid_truncate_like_per_box_ints():
+    tracker = CentroidTracker()
+    tracker.update(DetectionEngine.extract_detections([FakeResult(BOXES)]))
+    objects = tracker.objects
+    assert objects[0]["bbox"] == (10, 20, 50, 80)
+    assert (objects[0]["centroid_x"], objects[0]["centroid_y"]) == (30, 50)
+    assert objects[1]["bbox"] == (300, 100, 340, 220)
+    assert objects[1]["class_id"] == 2
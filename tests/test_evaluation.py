@@ -0,0 +1,92 @@
+import sys
+import types
+import pytest
+from src.evaluation import match_events, pareto_front, expand_grid, resolve_device
+
+def test_match_events_pairs_closest_first():
+    predicted = [("ENTRY", "zone1", 1.0), ("ENTRY", "zone1", 1.6)]
+    ground_truth = [("ENTRY", "zone1", 1.5), ("ENTRY", "zone1", 0.4)]
+
+    result = match_events(predicted, ground_truth, tolerance=1.0)
+
+    # 1.6<->1.5 is taken first, leaving 1.0<->0.4 rather than 1.0<->1.5 and an unmatched 1.6
+    assert result["matched"] == 2
+    assert result["mean_timing_error"] == pytest.approx((0.1 + 0.6) / 2)
+
+def test_match_events_requires_type_zone_and_tolerance():
+    predicted = [("EXIT", "zone1", 1.0), ("ENTRY", "zone2", 1.0), ("ENTRY", "zone1", 3.0)]
+    ground_truth = [("ENTRY", "zone1", 1.0)]
+
+    result = match_events(predicted, ground_truth, tolerance=1.0)
+
+    assert result["matched"] == 0
+    assert result["precision"] == 0.0
+    assert result["recall"] == 0.0
+    assert result["f1"] == 0.0
+    assert result["mean_timing_error"] is None
+
+def test_match_events_each_event_used_once():
+    predicted = [("ENTRY", "zone1", 1.0), ("ENTRY", "zone1", 1.1)]
+    ground_truth = [("ENTRY", "zone1", 1.0)]
+
+    result = match_events(predicted, ground_truth)
+
+    assert result["matched"] == 1
+    assert result["precision"] == 0.5
+    assert result["recall"] == 1.0
+    assert result["f1"] == pytest.approx(2 / 3)
+
+@pytest.mark.parametrize("predicted, ground_truth, precision, recall, f1", [
+    ([], [], 1.0, 1.0, 1.0),
+    ([], [("ENTRY", "zone1", 1.0)], 0.0, 0.0, 0.0),
+    ([("ENTRY", "zone1", 1.0)], [], 0.0, 1.0, 0.0),
+])
+def test_match_events_empty_inputs(predicted, ground_truth, precision, recall, f1):
+    result = match_events(predicted, ground_truth)
+
+    assert result["matched"] == 0
+    assert (result["precision"], result["recall"], result["f1"]) == (precision, recall, f1)
+    assert result["mean_timing_error"] is None
+
+def test_pareto_front_drops_dominated_trials_and_sorts_by_speed():
+    results = [
+        {"name": "accurate", "f1": 0.9, "effective_fps": 10.0},
+        {"name": "fast", "f1": 0.6, "effective_fps": 40.0},
+        {"name": "dominated", "f1": 0.5, "effective_fps": 30.0},
+        {"name": "balanced", "f1": 0.8, "effective_fps": 25.0},
+        {"name": "tie", "f1": 0.8, "effective_fps": 25.0},
+        {"name": "slower_same_f1", "f1": 0.9, "effective_fps": 5.0},
+    ]
+
+    front = pareto_front(results)
+
+    # Identical trials do not dominate each other
+    assert [r["name"] for r in front] == ["accurate", "balanced", "tie", "fast"]
+
+def test_expand_grid_is_the_cartesian_product():
+    grid = {"confidence": [0.3, 0.5], "stride": [1, 2, 4]}
+
+    trials = expand_grid(grid)
+
+    assert len(trials) == 6
+    assert trials[0] == {"confidence": 0.3, "stride": 1}
+    assert trials[-1] == {"confidence": 0.5, "stride": 4}
+    assert {(t["confidence"], t["stride"]) for t in trials} == {
+        (c, s) for c in grid["confidence"] for s in grid["stride"]
+    }
+
+def test_expand_grid_empty_value_list_yields_no_trials():
+    assert expand_grid({"confidence": [0.3], "stride": []}) == []
+
+def test_resolve_device_keeps_explicit_device():
+    assert resolve_device("cuda:1") == "cuda:1"
+    assert resolve_device("cpu") == "cpu"
+    assert resolve_device(0) == "cuda:0"
+
+@pytest.mark.parametrize("available, expected", [(True, "cuda"), (False, "cpu")])
+def test_resolve_device_auto_selects_like_ultralytics(monkeypatch, available, expected):
+    # device: null in settings.yaml means CUDA whenever torch can see a GPU
+    fake_torch = types.SimpleNamespace(cuda=types.SimpleNamespace(is_available=lambda: available))
+    monkeypatch.setitem(sys.modules, "torch", fake_torch)
+
+    assert resolve_device(None) == expected
@@ -0,0 +1,129 @@
+import json
+import time
+import sqlite3
+import threading
+from http.server import BaseHTTPRequestHandler
+import pytest
+from src.event_bus import ZoneEvent, EventSink, EventBus, SQLiteSink, build_event_bus
+
+class WebhookStub(BaseHTTPRequestHandler):
+    status = 200
+    batches = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        type(self).batches.append(json.loads(body))
+        self.send_response(self.status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def webhook(stub_server):
+    return stub_server(WebhookStub, "/events", status=200, batches=[])
+
+def webhook_bus(url, **options):
+    webhook = {"enabled": True, "url": url, "flush_interval": 10.0}
+    webhook.update(options)
+    config = {"events": {"file": {"enabled": False}, "gui": {"enabled": False}, "webhook": webhook}}
+    return build_event_bus(config, None, None)
+
+def publish(bus, count):
+    # Published before start() so batching does not depend on thread timing
+    for i in range(count):
+        bus.publish(ZoneEvent("ENTRY", i, "zone1", (10, 20), 100.0 + i))
+
+def test_webhook_batches(webhook):
+    webhook_url, stub = webhook
+    bus = webhook_bus(webhook_url, batch_size=3)
+    publish(bus, 7)
+    bus.start()
+    bus.stop()
+
+    assert [len(batch) for batch in stub.batches] == [3, 3, 1]
+    assert [e["obj_id"] for batch in stub.batches for e in batch] == list(range(7))
+    first = dict(stub.batches[0][0])
+    assert abs(first.pop("published_at") - time.time()) < 5
+    assert first == {
+        "event_type": "ENTRY", "obj_id": 0, "zone": "zone1", "location": [10, 20], "timestamp": 100.0
+    }
+    metrics = bus.metrics()["webhook"]
+    assert metrics["published"] == 7
+    assert metrics["delivered"] == 7
+    assert metrics["dropped"] == 0
+    # Lag is wall-clock, not measured from the (video position) event timestamp
+    assert 0 <= metrics["max_lag"] < 5
+
+@pytest.mark.parametrize("policy, kept", [("drop_oldest", [3, 4]), ("drop_newest", [0, 1])])
+def test_webhook_drop_policy(webhook, policy, kept):
+    webhook_url, stub = webhook
+    bus = webhook_bus(webhook_url, batch_size=10, max_queue=2, drop_policy=policy)
+    publish(bus, 5)
+    bus.start()
+    bus.stop()
+
+    assert [e["obj_id"] for batch in stub.batches for e in batch] == kept
+    metrics = bus.metrics()["webhook"]
+    assert metrics["dropped"] == 3
+    assert metrics["delivered"] == 2
+
+def test_webhook_counts_failed_on_5xx(webhook):
+    webhook_url, stub = webhook
+    stub.status = 503
+    bus = webhook_bus(webhook_url, batch_size=2)
+    publish(bus, 4)
+    bus.start()
+    bus.stop()
+
+    assert len(stub.batches) == 2
+    metrics = bus.metrics()["webhook"]
+    assert metrics["failed"] == 4
+    assert metrics["delivered"] == 0
+
+class BlockingSink(EventSink):
+    def __init__(self, name, release):
+        super().__init__(name)
+        self.release = release
+
+    def handle_batch(self, events):
+        self.release.wait(5)
+
+def test_stop_uses_one_shared_deadline():
+    release = threading.Event()
+    bus = EventBus()
+    for i in range(3):
+        bus.add_sink(BlockingSink(f"slow{i}", release))
+    bus.start()
+    bus.publish(ZoneEvent("ENTRY", 1, "zone1"))
+    time.sleep(0.1)
+
+    started = time.time()
+    bus.stop(timeout=0.5)
+    elapsed = time.time() - started
+    release.set()
+
+    assert elapsed < 1.0
+
+def test_sqlite_stores_wall_clock_time_and_upgrades_old_tables(tmp_path):
+    db_path = str(tmp_path / "events.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE events (timestamp REAL, event_type TEXT, obj_id INTEGER, zone TEXT, x INTEGER, y INTEGER)"
+    )
+    conn.execute("INSERT INTO events VALUES (1.0, 'ENTRY', 9, 'zone1', 1, 2)")
+    conn.commit()
+    conn.close()
+
+    sink = SQLiteSink(db_path)
+    sink.offer(ZoneEvent("EXIT", 1, "zone1", None, 12.5))
+    sink.start()
+    sink.stop()
+
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT timestamp, event_type, x, published_at FROM events ORDER BY rowid").fetchall()
+    conn.close()
+    assert rows[0] == (1.0, "ENTRY", 1, None)
+    assert rows[1][:3] == (12.5, "EXIT", None)
+    assert abs(rows[1][3] - time.time()) < 5
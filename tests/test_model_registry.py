@@ -0,0 +1,65 @@
+import pytest
+from src import model_registry
+
+class StubModel:
+    def __init__(self, path, device):
+        self.path = path
+        self.device = device
+        self.calls = []
+
+    def __call__(self, image, **kwargs):
+        self.calls.append((image.shape, kwargs["imgsz"], kwargs["classes"], kwargs["device"]))
+
+@pytest.fixture
+def stub_backend(monkeypatch):
+    loads = []
+
+    def load(model_path, device):
+        loads.append((model_path, device))
+        return StubModel(model_path, device)
+
+    monkeypatch.setitem(model_registry._LOADERS, "stub", load)
+    model_registry.clear()
+    yield loads
+    model_registry.clear()
+
+def test_one_load_per_path_backend_device(stub_backend):
+    first = model_registry.get_model("models/a.pt", backend="stub")
+    assert model_registry.get_model("models/a.pt", backend="stub") is first
+    assert model_registry.get_model("models/b.pt", backend="stub") is not first
+    assert model_registry.get_model("models/a.pt", backend="stub", device="cpu") is not first
+    assert len(stub_backend) == 3
+
+def test_one_warmup_per_frame_shape_and_imgsz(stub_backend):
+    model = model_registry.get_model("models/a.pt", backend="stub", frame_shape=(720, 1280), classes=[0])
+    model_registry.get_model("models/a.pt", backend="stub", frame_shape=(720, 1280), classes=[0])
+    assert model.calls == [((720, 1280, 3), 640, [0], None)]
+
+    model_registry.get_model("models/a.pt", backend="stub", frame_shape=(480, 640))
+    model_registry.get_model("models/a.pt", backend="stub", frame_shape=(720, 1280), imgsz=320)
+    model_registry.get_model("models/a.pt", backend="stub")  # No frame shape: square imgsz input
+    assert [call[:2] for call in model.calls] == [
+        ((720, 1280, 3), 640),
+        ((480, 640, 3), 640),
+        ((720, 1280, 3), 320),
+        ((640, 640, 3), 640),
+    ]
+    assert len(stub_backend) == 1
+
+def test_warmup_runs_and_disabled(stub_backend):
+    model = model_registry.get_model("models/a.pt", backend="stub", warmup_runs=3)
+    assert len(model.calls) == 3
+    other = model_registry.get_model("models/b.pt", backend="stub", warmup_runs=0)
+    assert other.calls == []
+
+def test_clear_forces_reload(stub_backend):
+    first = model_registry.get_model("models/a.pt", backend="stub")
+    model_registry.clear()
+    second = model_registry.get_model("models/a.pt", backend="stub")
+    assert second is not first
+    assert len(stub_backend) == 2
+    assert len(second.calls) == 1
+
+def test_unknown_backend_rejected(stub_backend):
+    with pytest.raises(ValueError):
+        model_registry.get_model("models/a.pt", backend="missing")
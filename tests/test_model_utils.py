@@ -0,0 +1,165 @@
+import os
+import hashlib
+from http.server import BaseHTTPRequestHandler
+import pytest
+from src import model_utils
+
+CONTENT = bytes(range(256)) * 4096  # 1MB
+CONTENT_MD5 = hashlib.md5(CONTENT).hexdigest()
+
+class RangeHandler(BaseHTTPRequestHandler):
+    content = CONTENT
+    honor_range = True
+    range_headers = []
+
+    def do_GET(self):
+        range_header = self.headers.get("Range")
+        type(self).range_headers.append(range_header)
+        start = 0
+        if range_header and self.honor_range:
+            start = int(range_header.split("=")[1].rstrip("-"))
+            if start >= len(self.content):
+                self.send_response(416)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(self.content) - 1}/{len(self.content)}")
+        else:
+            self.send_response(200)
+        body = self.content[start:]
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def range_server(stub_server):
+    return stub_server(RangeHandler, "/yolov8n.pt", range_headers=[])
+
+def test_download_resumes_from_partial_file(range_server, tmp_path):
+    server, handler = range_server
+    save_path = str(tmp_path / "yolov8n.pt")
+    with open(save_path + ".part", "wb") as f:
+        f.write(CONTENT[:300000])
+
+    model_utils.download_model(server, save_path)
+
+    assert handler.range_headers == ["bytes=300000-"]
+    with open(save_path, "rb") as f:
+        assert f.read() == CONTENT
+    assert not os.path.exists(save_path + ".part")
+
+def test_download_restarts_when_range_ignored(range_server, tmp_path):
+    server, handler = range_server
+    handler.honor_range = False
+    save_path = str(tmp_path / "yolov8n.pt")
+    with open(save_path + ".part", "wb") as f:
+        f.write(b"stale bytes")
+
+    model_utils.download_model(server, save_path)
+
+    with open(save_path, "rb") as f:
+        assert f.read() == CONTENT
+
+def test_download_completes_on_416_for_full_partial(range_server, tmp_path):
+    server, _ = range_server
+    save_path = str(tmp_path / "yolov8n.pt")
+    with open(save_path + ".part", "wb") as f:
+        f.write(CONTENT)
+
+    model_utils.download_model(server, save_path)
+
+    with open(save_path, "rb") as f:
+        assert f.read() == CONTENT
+
+def test_ensure_model_downloads_and_verifies(range_server, tmp_path):
+    server, _ = range_server
+    save_path = str(tmp_path / "models" / "yolov8n.pt")
+    assert model_utils.ensure_model(save_path, url=server, expected_digest=CONTENT_MD5) == save_path
+    with open(save_path, "rb") as f:
+        assert f.read() == CONTENT
+
+def test_cached_digest_reused_until_file_changes(tmp_path, monkeypatch):
+    path = str(tmp_path / "model.pt")
+    with open(path, "wb") as f:
+        f.write(CONTENT)
+
+    calls = []
+    real_hash_file = model_utils.hash_file
+    monkeypatch.setattr(model_utils, "hash_file", lambda *a: calls.append(a) or real_hash_file(*a))
+
+    digest = real_hash_file(path)
+    assert model_utils.verify_model(path, digest)
+    assert model_utils.verify_model(path, digest)
+    assert len(calls) == 1
+
+    # Same size, new mtime: rehashed
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert model_utils.verify_model(path, digest)
+    assert len(calls) == 2
+
+    # Different content and size: rehashed and rejected
+    with open(path, "ab") as f:
+        f.write(b"x")
+    assert not model_utils.verify_model(path, digest)
+    assert len(calls) == 3
+
+def test_cancelled_download_keeps_partial_for_resume(range_server, tmp_path):
+    server, _ = range_server
+    save_path = str(tmp_path / "yolov8n.pt")
+    model_utils.download_cancelled.set()
+    try:
+        with pytest.raises(RuntimeError):
+            model_utils.download_model(server, save_path)
+    finally:
+        model_utils.download_cancelled.clear()
+
+    assert not os.path.exists(save_path)
+    assert os.path.exists(save_path + ".part")
+
+def test_ensure_model_replaces_bad_file_only_after_verified_download(range_server, tmp_path):
+    server, _ = range_server
+    save_path = str(tmp_path / "yolov8n.pt")
+    with open(save_path, "wb") as f:
+        f.write(b"corrupt checkpoint")
+
+    model_utils.ensure_model(save_path, url=server, expected_digest=CONTENT_MD5)
+
+    with open(save_path, "rb") as f:
+        assert f.read() == CONTENT
+    assert not os.path.exists(save_path + ".part")
+
+def test_ensure_model_keeps_existing_file_when_download_fails_verification(stub_server, tmp_path):
+    server, _ = stub_server(RangeHandler, "/yolov8n.pt", content=b"wrong bytes", range_headers=[])
+    save_path = str(tmp_path / "yolov8n.pt")
+    with open(save_path, "wb") as f:
+        f.write(b"user checkpoint")
+
+    assert model_utils.ensure_model(save_path, url=server, expected_digest=CONTENT_MD5) == save_path
+
+    with open(save_path, "rb") as f:
+        assert f.read() == b"user checkpoint"
+    assert not os.path.exists(save_path + ".part")
+
+def test_ensure_model_keeps_existing_file_when_offline(tmp_path):
+    save_path = str(tmp_path / "yolov8n.pt")
+    with open(save_path, "wb") as f:
+        f.write(b"user checkpoint")
+
+    # Nothing listens on port 9 (discard) locally
+    assert model_utils.ensure_model(save_path, url="http://127.0.0.1:9/yolov8n.pt",
+                                    expected_digest=CONTENT_MD5) == save_path
+    with open(save_path, "rb") as f:
+        assert f.read() == b"user checkpoint"
+
+def test_ensure_model_raises_without_any_verified_file(stub_server, tmp_path):
+    server, _ = stub_server(RangeHandler, "/yolov8n.pt", content=b"wrong bytes", range_headers=[])
+    save_path = str(tmp_path / "yolov8n.pt")
+
+    with pytest.raises(RuntimeError):
+        model_utils.ensure_model(save_path, url=server, expected_digest=CONTENT_MD5)
+    assert not os.path.exists(save_path)
@@ -0,0 +1,118 @@
+import json
+import numpy as np
+from src import model_registry
+from src.detection_engine import DetectionEngine
+from src.zone_analytics import ZoneAnalytics
+from src.zone_manager import ZoneManager
+
+def test_entry_and_exit_track_occupancy():
+    za = ZoneAnalytics()
+    za.on_entry(1, "zone1", 0.0)
+    za.on_entry(2, "zone1", 1.0)
+    za.on_exit(1, "zone1", 3.0)
+
+    assert za.occupancy == {"zone1": 1}
+    assert za.total_entries == {"zone1": 2}
+
+def test_duplicate_entry_and_exit_without_entry_are_ignored():
+    za = ZoneAnalytics(dwell_bins=(1, 5, 10))
+    za.on_entry(1, "zone1", 0.0)
+    za.on_entry(1, "zone1", 2.0)
+    za.on_exit(2, "zone1", 3.0)
+
+    assert za.occupancy == {"zone1": 1}
+    assert za.total_entries == {"zone1": 1}
+    assert za.dwell_histograms == {}
+    # Dwell is measured from the first entry
+    za.on_exit(1, "zone1", 4.0)
+    za.on_exit(1, "zone1", 5.0)
+    assert za.occupancy == {"zone1": 0}
+    assert za.dwell_histograms["zone1"] == [0, 1, 0, 0]
+
+def test_dwell_exactly_on_an_edge_falls_in_the_lower_bin():
+    za = ZoneAnalytics(dwell_bins=(1, 5, 10))
+    for obj_id, dwell in enumerate([0.5, 1.0, 1.01, 5.0, 10.0, 10.5]):
+        za.on_entry(obj_id, "zone1", 100.0)
+        za.on_exit(obj_id, "zone1", 100.0 + dwell)
+
+    assert za.dwell_histograms["zone1"] == [2, 2, 1, 1]
+
+def test_new_peak_bucket_is_seeded_with_carried_over_occupancy():
+    za = ZoneAnalytics(bucket_seconds=60)
+    za.on_entry(1, "zone1", 10.0)
+    za.on_entry(2, "zone2", 20.0)
+    # First event of the next bucket is in zone2; zone1's object is still inside
+    za.on_exit(2, "zone2", 70.0)
+
+    assert za.peaks[0] == {"zone1": 1, "zone2": 1}
+    assert za.peaks[60] == {"zone1": 1, "zone2": 1}
+    assert za.occupancy == {"zone1": 1, "zone2": 0}
+
+def test_oldest_peak_buckets_are_evicted():
+    za = ZoneAnalytics(bucket_seconds=10, max_buckets=3)
+    for i in range(5):
+        za.on_entry(i, "zone1", i * 10.0)
+
+    assert list(za.peaks) == [20, 30, 40]
+    assert za.peaks[40] == {"zone1": 5}
+
+def test_restores_persisted_counts(tmp_path):
+    path = str(tmp_path / "analytics.json")
+    za = ZoneAnalytics(dwell_bins=(1, 5), bucket_seconds=60, persist_path=path)
+    za.on_entry(1, "zone1", 0.0)
+    za.on_exit(1, "zone1", 2.0)
+    za.on_entry(2, "zone1", 3.0)
+    za.persist()
+
+    restored = ZoneAnalytics(dwell_bins=(1, 5), bucket_seconds=60, persist_path=path)
+    assert restored.total_entries == {"zone1": 2}
+    assert restored.dwell_histograms == {"zone1": [0, 1, 0]}
+    assert restored.peaks == {0: {"zone1": 1}}
+    # Objects inside at shutdown are not carried over
+    assert restored.occupancy == {}
+
+    restored.on_entry(3, "zone1", 10.0)
+    restored.persist()
+    with open(path) as f:
+        assert json.load(f)["total_entries"] == {"zone1": 3}
+
+def test_restore_skips_histograms_when_bins_change(tmp_path):
+    path = str(tmp_path / "analytics.json")
+    za = ZoneAnalytics(dwell_bins=(1, 5), persist_path=path)
+    za.on_entry(1, "zone1", 0.0)
+    za.on_exit(1, "zone1", 2.0)
+    za.persist()
+
+    restored = ZoneAnalytics(dwell_bins=(1, 5, 10), persist_path=path)
+    assert restored.total_entries == {"zone1": 1}
+    assert restored.dwell_histograms == {}
+
+def test_restore_ignores_corrupt_file(tmp_path):
+    path = tmp_path / "analytics.json"
+    path.write_text("{not json")
+
+    za = ZoneAnalytics(persist_path=str(path))
+    assert za.total_entries == {}
+    assert za.peaks == {}
+
+def test_dropped_track_exits_at_last_seen_time(monkeypatch):
+    monkeypatch.setattr(model_registry, "get_model", lambda *args, **kwargs: None)
+    zm = ZoneManager()
+    zm.add_zone("zone1", [(0, 0), (100, 0), (100, 100), (0, 100)], "#e74c3c")
+    config = {
+        "model": "yolov8n.pt", "classes": [0], "max_disappeared": 2, "max_distance": 70,
+        "events": {"file": {"enabled": False}, "gui": {"enabled": False}}
+    }
+    engine = DetectionEngine(zm, None, config)
+    box = np.array([[40, 40, 60, 60, 0, 0.9]], dtype=np.float32)
+    try:
+        for i, detections in enumerate([box, box, box, box] + [np.empty((0, 6))] * 3):
+            objects = engine.tracker.update(detections)
+            engine.process_intrusions(objects, now=float(i))
+            engine.prev_objects = objects
+    finally:
+        engine.cleanup()
+
+    # Entry confirmed at t=2, last detected at t=3, dropped at t=6: dwell is 1s, not 4s
+    assert engine.analytics.dwell_histograms["zone1"] == [1, 0, 0, 0, 0, 0, 0, 0]
+    assert engine.analytics.occupancy == {"zone1": 0}
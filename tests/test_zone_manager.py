@@ -0,0 +1,45 @@
+import random
+from shapely.geometry import Point
+from src.zone_manager import ZoneManager
+
+def linear_point_in_zones(zone_manager, point):
+    """The pre-index implementation: test every zone polygon"""
+    p = Point(point)
+    return {zone["label"] for zone in zone_manager.zones if zone["polygon"].contains(p)}
+
+def make_zones(zone_manager):
+    zone_manager.add_zone("square", [(0, 0), (100, 0), (100, 100), (0, 100)], "#e74c3c")
+    zone_manager.add_zone("overlap", [(50, 50), (150, 50), (150, 150), (50, 150)], "#2ecc71")
+    zone_manager.add_zone("triangle", [(200, 0), (300, 0), (250, 100)], "#f39c12")
+
+def test_matches_linear_scan_on_random_and_edge_points():
+    zm = ZoneManager()
+    make_zones(zm)
+    rng = random.Random(0)
+    points = [(rng.uniform(-20, 320), rng.uniform(-20, 170)) for _ in range(2000)]
+    # Vertices, edges and shared boundaries
+    points += [(0, 0), (100, 50), (50, 100), (50, 50), (100, 100), (250, 100), (225, 50), (150, 150)]
+    for point in points:
+        assert zm.point_in_zones(point) == linear_point_in_zones(zm, point)
+
+def test_edge_points_are_outside():
+    zm = ZoneManager()
+    make_zones(zm)
+    assert zm.point_in_zones((100, 25)) == set()
+    assert zm.point_in_zones((75, 75)) == {"square", "overlap"}
+
+def test_index_rebuilt_after_clear_and_load(tmp_path):
+    zm = ZoneManager()
+    make_zones(zm)
+    path = tmp_path / "zones.json"
+    zm.save_zones(str(path))
+
+    zm.clear_zones()
+    assert zm.point_in_zones((10, 10)) == set()
+
+    zm.load_zones(str(path))
+    assert zm.point_in_zones((10, 10)) == {"square"}
+    assert zm.point_in_zones((10, 10)) == linear_point_in_zones(zm, (10, 10))
+
+    zm.add_zone("late", [(0, 0), (20, 0), (20, 20), (0, 20)], "#9b59b6")
+    assert zm.point_in_zones((10, 10)) == {"square", "late"}